@@ -1,8 +1,9 @@
 from qiskit import QuantumCircuit, transpile, QuantumRegister, ClassicalRegister
 from qiskit_aer import Aer
-from qiskit.circuit.library import RYGate, RZGate
+from qiskit.circuit.library import CSwapGate, RYGate, RZGate
 import numpy as np
 Decompose_CSWAP = False
+_CSWAP = CSwapGate()
 def cswap(cir:QuantumCircuit,*q):
     if Decompose_CSWAP:
         cir.rz(1.9986164569854736,q[1])
@@ -47,7 +48,7 @@ def cswap(cir:QuantumCircuit,*q):
         cir.rx(1.399273157119751,q[2])
         cir.rz(-2.39945387840271,q[2])
     else:
-        cir.cswap(*q)
+        cir.append(_CSWAP, q)
 
 class RouterQubit:
     def __init__(self, index, level, direction, root):
@@ -93,16 +94,22 @@ class Qram:
         self.circuit = QuantumCircuit(*regs)
         self.routers = [[] for _ in range(len(address))]
     def add_router_tree(self, level,root):
-        self.circuit.add_register(root.qreg)
+        # Collect the whole tree's registers, then attach them in one call
+        regs = []
+        self._collect_router_tree(level, root, regs)
+        self.circuit.add_register(*regs)
+
+    def _collect_router_tree(self, level, root, regs):
+        regs.append(root.qreg)
         if root.left_router is not None:
-            self.circuit.add_register(root.left_router.qreg)
+            regs.append(root.left_router.qreg)
         if root.right_router is not None:
-            self.circuit.add_register(root.right_router.qreg)
+            regs.append(root.right_router.qreg)
         self.routers[level].append(root)
         if root.left is not None:
-            self.add_router_tree(level + 1, root.left)
+            self._collect_router_tree(level + 1, root.left, regs)
         if root.right is not None:
-            self.add_router_tree(level + 1, root.right)
+            self._collect_router_tree(level + 1, root.right, regs)
 
     def add_incident_qubits(self, incident):
         self.incident = incident
@@ -183,12 +190,14 @@ class Qram:
             self.layers_router(circuit, self.routers[0][0], incidents[idx], idx, self.incident)
             circuit.barrier()
         for router_obj in self.routers[-1]:
-            if self.data[int(router_obj.address + '1', 2)] == 1:
+            # data index of the leaf's left branch; the right one is left | 1
+            left = int(router_obj.address or '0', 2) << 1
+            if self.data[left | 1] == 1:
                 circuit.cz(router_obj.qreg, router_obj.data)
             # else:
             #     circuit.cz(router_obj.qreg, router_obj.data)
 
-            if self.data[int(router_obj.address + '0', 2)] == 1:
+            if self.data[left] == 1:
                 circuit.x(router_obj.qreg)
                 circuit.cz(router_obj.qreg, router_obj.data)
                 circuit.x(router_obj.qreg)
@@ -1,5 +1,11 @@
 """FT-QRAM package."""
 
-from .dual_rail import DualRailQram
-
 __all__ = ["DualRailQram"]
+
+
+def __getattr__(name: str):
+    if name == "DualRailQram":
+        from .dual_rail import DualRailQram
+
+        return DualRailQram
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
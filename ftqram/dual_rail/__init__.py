@@ -1,9 +1,9 @@
 """Dual-rail FT-QRAM implementation."""
 
-from .qram import DualRailQram
-from .bucktele_qram import DualRailBucketQram
 from .qubits import (
     DualRailPair,
+    initialize_dual_rail,
+    initialize_dual_rail_superposition,
     logical_h,
     logical_x,
     logical_z,
@@ -16,6 +16,8 @@ __all__ = [
     "DualRailQram",
     "DualRailBucketQram",
     "DualRailPair",
+    "initialize_dual_rail",
+    "initialize_dual_rail_superposition",
     "logical_h",
     "logical_x",
     "logical_z",
@@ -23,3 +25,24 @@ __all__ = [
     "prepare_logical_one",
     "split_dual_rail_register",
 ]
+
+# The QRAM builders are imported on first access so that using the pair
+# helpers alone does not load the router/builder modules.
+_LAZY_IMPORTS = {
+    "DualRailQram": ".qram",
+    "DualRailBucketQram": ".bucktele_qram",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,12 +3,51 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
 from qiskit import QuantumCircuit, QuantumRegister
+from qiskit.circuit import Qubit
 
-from .ops import cswap_dual_rail, swap_dual_rail
-from .qubits import DualRailPair, logical_h, logical_x, prepare_logical_zero
+from . import emit
+from .ops import cswap_dual_rail, swap_dual_rail, swap_dual_rail_instructions
+from .qubits import DualRailPair, logical_h, logical_x, prepare_logical_zero, split_dual_rail_register
+from .utils import depth_from_address
+
+
+def _router_template(reverse: bool = False) -> QuantumCircuit:
+    """Build the router gate pattern once on 8 qubits.
+
+    Qubit order: router, incident, left, right (two rails each).
+    """
+
+    qreg = QuantumRegister(8, "q")
+    template = QuantumCircuit(qreg, name="router_dg" if reverse else "router")
+    router, incident, left, right = split_dual_rail_register(qreg)
+    if reverse:
+        cswap_dual_rail(template, router.rail0, incident, right)
+        logical_x(template, router)
+        cswap_dual_rail(template, router.rail0, incident, left)
+        logical_x(template, router)
+    else:
+        logical_x(template, router)
+        cswap_dual_rail(template, router.rail0, incident, left)
+        logical_x(template, router)
+        cswap_dual_rail(template, router.rail0, incident, right)
+    return template
+
+
+_ROUTER_TEMPLATE = _router_template()
+_REVERSE_ROUTER_TEMPLATE = _router_template(reverse=True)
+
+
+def _router_qubits(router: DualRailPair, incident: DualRailPair, left: DualRailPair, right: DualRailPair) -> list:
+    return [
+        router.rail0, router.rail1,
+        incident.rail0, incident.rail1,
+        left.rail0, left.rail1,
+        right.rail0, right.rail1,
+    ]
 
 
 @dataclass
@@ -24,26 +63,31 @@ class DualRailRouterQubit:
     right_router: Optional["DualRailRouterQubit"] = None
     left: Optional["DualRailRouterQubit"] = None
     right: Optional["DualRailRouterQubit"] = None
+    # Rails inside a shared layer register; a private register is allocated if omitted.
+    rails: Optional[Tuple[Qubit, Qubit]] = None
 
     def __post_init__(self) -> None:
-        self.qreg = QuantumRegister(2, self.reg_name)
+        # Computed once; the parent's address is already final at this point.
+        self.address = self.direction if self.parent is None else self.parent.address + self.direction
+        self.reg_name = f"router_{self.level}_{self.address}" if self.address else f"router_{self.level}"
+        self._qreg: Optional[QuantumRegister] = None
+        if self.rails is None:
+            self._qreg = QuantumRegister(2, self.reg_name)
+            self.rails = (self._qreg[0], self._qreg[1])
+        self.pair = DualRailPair(self.rails[0], self.rails[1], self.reg_name)
         self.data: Optional[QuantumRegister] = None
 
     @property
-    def address(self) -> str:
-        if self.parent is None:
-            return self.direction
-        return self.parent.address + self.direction
+    def qreg(self) -> QuantumRegister:
+        """The node's two rails as a register.
 
-    @property
-    def reg_name(self) -> str:
-        if self.address:
-            return f"router_{self.level}_{self.address}"
-        return f"router_{self.level}"
+        For tree nodes this is built on first use as an alias over the rails
+        in the shared layer register.
+        """
 
-    @property
-    def pair(self) -> DualRailPair:
-        return DualRailPair(self.qreg[0], self.qreg[1], self.reg_name)
+        if self._qreg is None:
+            self._qreg = QuantumRegister(name=self.reg_name, bits=list(self.rails))
+        return self._qreg
 
     def add_data_qubits(self, circuit: QuantumCircuit) -> None:
         self.data = QuantumRegister(1, f"{self.reg_name}_data")
@@ -53,48 +97,81 @@ class DualRailRouterQubit:
 class DualRailBucketQram:
     """Dual-rail QRAM that mirrors bucktele.py's bucket-brigade routing."""
 
-    def __init__(self, address, data: List[int], *regs, bandwidth: int = 1) -> None:
-        self.address = address
+    def __init__(
+        self,
+        depth: Union[int, List[str], None] = None,
+        data: Optional[List[int]] = None,
+        *regs,
+        bandwidth: int = 1,
+        use_barriers: bool = True,
+        address: Union[int, List[str], None] = None,
+    ) -> None:
+        if data is None:
+            raise TypeError("DualRailBucketQram() missing required argument: 'data'")
         self.data = data
         self.bandwidth = bandwidth
+        # Barriers only separate layers for drawing/transpiling; simulators
+        # gain nothing from them.
+        self.use_barriers = use_barriers
         self.circuit = QuantumCircuit(*regs) if regs else None
-        self.depth = len(address[0]) if isinstance(address, list) and address else int(address)
-        self.routers: List[List[DualRailRouterQubit]] = [
-            [] for _ in range(self.depth)
-        ]
-        self.root = self._build_tree(0, "", None)
+        # address is the pre-depth name of the first argument, kept as a deprecated alias.
+        self._address = depth if address is None else address
+        self.depth = depth_from_address(depth, address)
+        self.routers: List[List[DualRailRouterQubit]] = []
+        self.layer_regs: List[QuantumRegister] = []
+        self.root = self._build_tree()
         self.incident: Optional[DualRailRouterQubit] = None
 
-    def _build_tree(
-        self, level: int, direction: str, parent: Optional[DualRailRouterQubit]
-    ) -> DualRailRouterQubit:
-        node = DualRailRouterQubit(
-            index=len(self.routers[level]),
-            level=level,
-            direction=direction,
-            parent=parent,
-        )
-        self.routers[level].append(node)
+    @property
+    def address(self) -> Union[int, List[str]]:
+        """The depth (or deprecated address list) this QRAM was built from."""
+
+        return self._address
 
-        node.left_router = DualRailRouterQubit(0, level, "l", node)
-        node.right_router = DualRailRouterQubit(0, level, "r", node)
+    def _build_tree(self) -> DualRailRouterQubit:
+        """Allocate the router tree level by level; returns the root.
 
-        if level < self.depth - 1:
-            node.left = self._build_tree(level + 1, "0", node)
-            node.right = self._build_tree(level + 1, "1", node)
-        return node
+        Each level shares one register for its routers and one for their
+        left/right links instead of a 2-qubit register per node.
+        """
+
+        self.routers = [[] for _ in range(self.depth)]
+        self.layer_regs = []
+        for level in range(self.depth):
+            node_reg = QuantumRegister(2 << level, f"routers_{level}")
+            link_reg = QuantumRegister(4 << level, f"links_{level}")
+            self.layer_regs += [node_reg, link_reg]
+            for i in range(1 << level):
+                parent = self.routers[level - 1][i >> 1] if level else None
+                direction = "" if parent is None else str(i & 1)
+                node = DualRailRouterQubit(
+                    index=i,
+                    level=level,
+                    direction=direction,
+                    parent=parent,
+                    rails=(node_reg[2 * i], node_reg[2 * i + 1]),
+                )
+                node.left_router = DualRailRouterQubit(0, level, "l", node, rails=(link_reg[4 * i], link_reg[4 * i + 1]))
+                node.right_router = DualRailRouterQubit(0, level, "r", node, rails=(link_reg[4 * i + 2], link_reg[4 * i + 3]))
+                if parent is not None:
+                    if i & 1:
+                        parent.right = node
+                    else:
+                        parent.left = node
+                self.routers[level].append(node)
+        return self.routers[0][0]
 
     def add_router_tree(self, level: int, root: DualRailRouterQubit) -> None:
-        self.circuit.add_register(root.qreg)
-        if root.left_router is not None:
-            self.circuit.add_register(root.left_router.qreg)
-        if root.right_router is not None:
-            self.circuit.add_register(root.right_router.qreg)
-        # routers are already tracked during _build_tree
-        if root.left is not None:
-            self.add_router_tree(level + 1, root.left)
-        if root.right is not None:
-            self.add_router_tree(level + 1, root.right)
+        """Add the registers holding the router tree from level down to self.circuit.
+
+        Rails live in per-level registers shared by the whole level, so this
+        adds those registers (once each) rather than one register per node.
+        """
+
+        present = set(self.circuit.qregs)
+        regs = [reg for reg in self.layer_regs[2 * level :] if reg not in present]
+        if regs:
+            self.circuit.add_register(*regs)
 
     def add_incident_qubits(self, incident: DualRailRouterQubit) -> None:
         self.incident = incident
@@ -103,105 +180,93 @@ class DualRailBucketQram:
     def __call__(self, address_qubits: QuantumRegister, bus_qubits: QuantumRegister) -> QuantumCircuit:
         self.address_qubits = address_qubits
         self.bus_qubits = bus_qubits
-        if self.circuit is None:
-            self.circuit = QuantumCircuit(address_qubits, bus_qubits)
-
-        # Build router tree and incident register
-        self.routers = [[] for _ in range(self.depth)]
-        self.root = self._build_tree(0, "", None)
-        self.add_router_tree(0, self.root)
-
-        incident = DualRailRouterQubit(0, 0, "inc", None)
-        self.add_incident_qubits(incident)
 
+        # Build router tree, incident pair and leaf data qubits
+        self.root = self._build_tree()
+        self.incident = DualRailRouterQubit(0, 0, "inc", None)
         for node in self.routers[-1]:
-            node.add_data_qubits(self.circuit)
+            node.data = QuantumRegister(1, f"{node.reg_name}_data")
+
+        # Collect every register first so the circuit is assembled in one go.
+        regs = [*self.layer_regs, self.incident.qreg, *(node.data for node in self.routers[-1])]
+        if self.circuit is None:
+            self.circuit = QuantumCircuit(address_qubits, bus_qubits, *regs)
+        else:
+            self.circuit.add_register(*regs)
 
         self.decompose_circuit(self.circuit)
         return self.circuit
 
     def _router(self, circuit: QuantumCircuit, router: DualRailPair, incident: DualRailPair, left: DualRailPair, right: DualRailPair) -> None:
-        logical_x(circuit, router)
-        cswap_dual_rail(circuit, router.rail0, incident, left)
-        logical_x(circuit, router)
-        cswap_dual_rail(circuit, router.rail0, incident, right)
+        circuit.compose(_ROUTER_TEMPLATE, qubits=_router_qubits(router, incident, left, right), inplace=True)
 
     def _reverse_router(self, circuit: QuantumCircuit, router: DualRailPair, incident: DualRailPair, left: DualRailPair, right: DualRailPair) -> None:
-        cswap_dual_rail(circuit, router.rail0, incident, right)
-        logical_x(circuit, router)
-        cswap_dual_rail(circuit, router.rail0, incident, left)
-        logical_x(circuit, router)
+        circuit.compose(_REVERSE_ROUTER_TEMPLATE, qubits=_router_qubits(router, incident, left, right), inplace=True)
 
-    def _layers_router(
-        self,
-        circuit: QuantumCircuit,
-        router_obj: DualRailRouterQubit,
-        incident: DualRailPair,
-        address_index: int,
-        mid: DualRailRouterQubit,
-    ) -> None:
-        if router_obj.level == 0:
-            swap_dual_rail(circuit, incident, mid.pair)
-        if router_obj.level == 0 and address_index == 0:
-            swap_dual_rail(circuit, router_obj.pair, mid.pair)
-        else:
-            if router_obj.level + 2 == address_index and address_index == len(self.address_qubits) // 2:
-                self._router(circuit, router_obj.pair, mid.pair, router_obj.left.pair, router_obj.right.pair)
-                return
-
-            self._router(
-                circuit,
-                router_obj.pair,
-                mid.pair,
-                router_obj.left_router.pair,
-                router_obj.right_router.pair,
-            )
-            if router_obj.level + 1 == address_index:
-                if router_obj.left_router is not None and router_obj.left is not None:
-                    swap_dual_rail(circuit, router_obj.left_router.pair, router_obj.left.pair)
-                if router_obj.right_router is not None and router_obj.right is not None:
-                    swap_dual_rail(circuit, router_obj.right_router.pair, router_obj.right.pair)
-                return
-            if router_obj.left is not None:
-                self._layers_router(circuit, router_obj.left, router_obj.left_router.pair, address_index, router_obj.left_router)
-            if router_obj.right is not None:
-                self._layers_router(circuit, router_obj.right, router_obj.right_router.pair, address_index, router_obj.right_router)
-
-    def _reverse_layers_router(
-        self,
-        circuit: QuantumCircuit,
-        router_obj: DualRailRouterQubit,
-        incident: DualRailPair,
-        address_index: int,
-        mid: DualRailRouterQubit,
-    ) -> None:
-        if address_index != 0:
-            if router_obj.level + 1 > address_index:
-                return
-            if router_obj.right is not None:
-                self._reverse_layers_router(circuit, router_obj.right, router_obj.right_router.pair, address_index, router_obj.right_router)
-            if router_obj.left is not None:
-                self._reverse_layers_router(circuit, router_obj.left, router_obj.left_router.pair, address_index, router_obj.left_router)
-            if router_obj.level + 2 == address_index and address_index == len(self.address_qubits) // 2:
-                self._router(circuit, router_obj.pair, mid.pair, router_obj.left.pair, router_obj.right.pair)
-                return
-            elif router_obj.level + 1 == address_index and address_index != len(self.address_qubits) // 2:
-                if router_obj.left_router is not None and router_obj.left is not None:
-                    swap_dual_rail(circuit, router_obj.left_router.pair, router_obj.left.pair)
-                if router_obj.right_router is not None and router_obj.right is not None:
-                    swap_dual_rail(circuit, router_obj.right_router.pair, router_obj.right.pair)
-            if router_obj.right_router is not None:
-                self._reverse_router(
-                    circuit,
-                    router_obj.pair,
-                    mid.pair,
-                    router_obj.left_router.pair,
-                    router_obj.right_router.pair,
-                )
-        else:
-            swap_dual_rail(circuit, router_obj.pair, mid.pair)
-        if router_obj.level == 0:
-            swap_dual_rail(circuit, incident, mid.pair)
+    def _link(self, node: DualRailRouterQubit) -> DualRailRouterQubit:
+        """The pair feeding a node: the parent's left/right link, or the incident pair."""
+
+        if node.parent is None:
+            return self.incident
+        return node.parent.right_router if node.index & 1 else node.parent.left_router
+
+    @staticmethod
+    def _swap_links_to_children(circuit: QuantumCircuit, node: DualRailRouterQubit) -> None:
+        """Swap both link pairs of node into its children, as one batch."""
+
+        emit.extend(
+            circuit,
+            swap_dual_rail_instructions(node.left_router.pair, node.left.pair)
+            + swap_dual_rail_instructions(node.right_router.pair, node.right.pair),
+        )
+
+    def _layers_router(self, circuit: QuantumCircuit, incident: DualRailPair, address_index: int) -> None:
+        """Route one incident qubit down the tree, level by level."""
+
+        mid = self.incident.pair
+        swap_dual_rail(circuit, incident, mid)
+        if address_index == 0:
+            swap_dual_rail(circuit, self.root.pair, mid)
+            return
+
+        num_address = len(self.address_qubits) // 2
+        for level in range(address_index):
+            # The bus (last incident) is routed straight into the leaves.
+            into_leaves = level + 2 == address_index == num_address
+            for node in self.routers[level]:
+                link = self._link(node).pair
+                if into_leaves:
+                    self._router(circuit, node.pair, link, node.left.pair, node.right.pair)
+                    continue
+                self._router(circuit, node.pair, link, node.left_router.pair, node.right_router.pair)
+                if level + 1 == address_index and node.left is not None:
+                    self._swap_links_to_children(circuit, node)
+            if into_leaves:
+                break
+
+    def _reverse_layers_router(self, circuit: QuantumCircuit, incident: DualRailPair, address_index: int) -> None:
+        """Undo _layers_router for one incident qubit, deepest level first."""
+
+        mid = self.incident.pair
+        if address_index == 0:
+            swap_dual_rail(circuit, self.root.pair, mid)
+            swap_dual_rail(circuit, incident, mid)
+            return
+
+        num_address = len(self.address_qubits) // 2
+        for level in reversed(range(address_index)):
+            for node in reversed(self.routers[level]):
+                link = self._link(node).pair
+                if level + 2 == address_index == num_address:
+                    self._router(circuit, node.pair, link, node.left.pair, node.right.pair)
+                    continue
+                if level + 1 == address_index != num_address and node.left is not None:
+                    self._swap_links_to_children(circuit, node)
+                self._reverse_router(circuit, node.pair, link, node.left_router.pair, node.right_router.pair)
+        # As in bucktele.py, the incident swap is skipped when the root itself
+        # routes into the leaves.
+        if not address_index == num_address == 2:
+            swap_dual_rail(circuit, incident, mid)
 
     def decompose_circuit(self, circuit: QuantumCircuit) -> None:
         # Prepare bus in logical |+>
@@ -219,26 +284,28 @@ class DualRailBucketQram:
         incidents.update({i + len(address_pairs): bus_pairs[i] for i in range(len(bus_pairs))})
 
         for idx in range(len(incidents)):
-            self._layers_router(circuit, self.routers[0][0], incidents[idx], idx, self.incident)
+            self._layers_router(circuit, incidents[idx], idx)
+            if self.use_barriers:
+                circuit.barrier()
+
+        # Memory interaction on leaf nodes. Leaf i serves data[2i] (left) and
+        # data[2i + 1] (right); only leaves with a set bit are visited.
+        leaves = self.routers[-1]
+        marked = np.asarray(self.data) == 1
+        for i in np.flatnonzero(marked[1::2]):
+            emit.cz(circuit, leaves[i].pair.rail0, leaves[i].data[0])
+        for i in np.flatnonzero(marked[0::2]):
+            logical_x(circuit, leaves[i].pair)
+            emit.cz(circuit, leaves[i].pair.rail0, leaves[i].data[0])
+            logical_x(circuit, leaves[i].pair)
+
+        if self.use_barriers:
             circuit.barrier()
 
-        # Memory interaction on leaf nodes
-        for router_obj in self.routers[-1]:
-            left_idx = int(router_obj.address + "0", 2)
-            right_idx = int(router_obj.address + "1", 2)
-
-            if self.data[right_idx] == 1:
-                circuit.cz(router_obj.pair.rail0, router_obj.data[0])
-            if self.data[left_idx] == 1:
-                logical_x(circuit, router_obj.pair)
-                circuit.cz(router_obj.pair.rail0, router_obj.data[0])
-                logical_x(circuit, router_obj.pair)
-
-        circuit.barrier()
-
         for idx in reversed(range(len(address_pairs) + 1)):
-            self._reverse_layers_router(circuit, self.routers[0][0], incidents[idx], idx, self.incident)
-            circuit.barrier()
+            self._reverse_layers_router(circuit, incidents[idx], idx)
+            if self.use_barriers:
+                circuit.barrier()
 
         for pair in bus_pairs:
             logical_h(circuit, pair)
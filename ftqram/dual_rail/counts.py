@@ -0,0 +1,59 @@
+"""Vectorized post-processing of measurement counts."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit
+
+
+def counts_to_bit_array(counts: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode a counts dict into (bits, weights).
+
+    bits[k, i] is classical bit i (circuit clbit order) of the k-th outcome and
+    weights[k] its count (or probability, for exact distributions). Register
+    separators are stripped in one pass.
+    """
+
+    weights = np.asarray(list(counts.values()))
+    if not counts:
+        return np.zeros((0, 0), dtype=np.uint8), weights
+    flat = "".join(counts).replace(" ", "").encode("ascii")
+    bits = np.frombuffer(flat, dtype=np.uint8).reshape(len(counts), -1) - ord("0")
+    # Qiskit prints the highest clbit first.
+    return bits[:, ::-1], weights
+
+
+def register_bit_indices(circuit: QuantumCircuit, creg: ClassicalRegister) -> List[int]:
+    """Positions of a classical register's bits among the circuit clbits."""
+
+    return [circuit.find_bit(bit).index for bit in creg]
+
+
+def shot_categories(
+    counts: Dict[str, int],
+    circuit: QuantumCircuit,
+    syndrome: ClassicalRegister,
+    outputs: Sequence[ClassicalRegister],
+) -> Dict[str, int]:
+    """Split shots into flagged / invalid / accepted with boolean masks.
+
+    flagged: any syndrome bit set. invalid: unflagged, but some output
+    dual-rail pair (consecutive bits of an output register) is not one-hot.
+    accepted: the rest.
+    """
+
+    bits, weights = counts_to_bit_array(counts)
+    if not len(weights):
+        return {"flagged": 0, "invalid": 0, "accepted": 0}
+    flagged = bits[:, register_bit_indices(circuit, syndrome)].any(axis=1)
+    valid = np.ones(len(weights), dtype=bool)
+    for creg in outputs:
+        rails = bits[:, register_bit_indices(circuit, creg)]
+        valid &= (rails[:, 0::2] ^ rails[:, 1::2]).all(axis=1)
+    return {
+        "flagged": weights[flagged].sum().item(),
+        "invalid": weights[~flagged & ~valid].sum().item(),
+        "accepted": weights[~flagged & valid].sum().item(),
+    }
@@ -2,24 +2,32 @@
 
 from __future__ import annotations
 
-from qiskit import QuantumCircuit
-from qiskit.circuit import Qubit
+from typing import List
 
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.circuit import CircuitInstruction, Qubit
+
+from . import emit
 from .qubits import DualRailPair
 
 
+def swap_dual_rail_instructions(a: DualRailPair, b: DualRailPair) -> List[CircuitInstruction]:
+    """Instructions of swap_dual_rail, for callers that batch several swaps."""
+
+    return [emit.swap_instruction(a.rail0, b.rail0), emit.swap_instruction(a.rail1, b.rail1)]
+
+
 def swap_dual_rail(circuit: QuantumCircuit, a: DualRailPair, b: DualRailPair) -> None:
     """Swap two dual-rail logical qubits (rail-wise swap)."""
 
-    circuit.swap(a.rail0, b.rail0)
-    circuit.swap(a.rail1, b.rail1)
+    emit.extend(circuit, swap_dual_rail_instructions(a, b))
 
 
 def cswap_dual_rail(circuit: QuantumCircuit, control: Qubit, a: DualRailPair, b: DualRailPair) -> None:
     """Controlled swap for a dual-rail logical qubit (rail-wise CSWAP)."""
 
-    circuit.cswap(control, a.rail0, b.rail0)
-    circuit.cswap(control, a.rail1, b.rail1)
+    emit.cswap(circuit, control, a.rail0, b.rail0)
+    emit.cswap(circuit, control, a.rail1, b.rail1)
 
 
 def measure_parity(
@@ -27,16 +35,19 @@ def measure_parity(
     pair: DualRailPair,
     ancilla: Qubit,
     cbit,
+    reset: bool = True,
 ) -> None:
     """Measure parity (odd/even) of a dual-rail pair into classical bit.
 
     Odd parity (01 or 10) corresponds to a valid dual-rail state.
+    Pass reset=False only when the ancilla is known to be in |0>.
     """
 
-    circuit.reset(ancilla)
-    circuit.cx(pair.rail0, ancilla)
-    circuit.cx(pair.rail1, ancilla)
-    circuit.measure(ancilla, cbit)
+    if reset:
+        emit.reset(circuit, ancilla)
+    emit.cx(circuit, pair.rail0, ancilla)
+    emit.cx(circuit, pair.rail1, ancilla)
+    emit.measure(circuit, ancilla, cbit)
 
 
 def measure_conservation(
@@ -49,6 +60,29 @@ def measure_conservation(
 ) -> None:
     """Measure parity of left/right output rails for conservation checks."""
 
-    measure_parity(circuit, left, ancilla, cbit_left)
-    measure_parity(circuit, right, ancilla, cbit_right)
+    qubits = [left.rail0, left.rail1, right.rail0, right.rail1, ancilla]
+    if cbit_left == cbit_right:
+        circuit.compose(_SHARED_CONSERVATION_TEMPLATE, qubits=qubits, clbits=[cbit_left], inplace=True)
+    else:
+        circuit.compose(_CONSERVATION_TEMPLATE, qubits=qubits, clbits=[cbit_left, cbit_right], inplace=True)
+
+
+def _conservation_template(shared_bit: bool) -> QuantumCircuit:
+    """Both parity checks of measure_conservation, built once.
+
+    Qubit order: left rails, right rails, ancilla. With shared_bit both
+    results go to a single classical bit (overwrite mode).
+    """
+
+    qreg = QuantumRegister(5, "q")
+    creg = ClassicalRegister(1 if shared_bit else 2, "c")
+    template = QuantumCircuit(qreg, creg, name="conservation")
+    left, right = DualRailPair(qreg[0], qreg[1]), DualRailPair(qreg[2], qreg[3])
+    measure_parity(template, left, qreg[4], creg[0])
+    measure_parity(template, right, qreg[4], creg[-1])
+    return template
+
+
+_CONSERVATION_TEMPLATE = _conservation_template(shared_bit=False)
+_SHARED_CONSERVATION_TEMPLATE = _conservation_template(shared_bit=True)
 
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Tuple
+from functools import lru_cache
+from typing import Iterable, List, Literal, Optional, Tuple, Union
 
+import numpy as np
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
+from qiskit.circuit import ParameterVector
 
+from . import emit
 from .qubits import DualRailPair, logical_h, prepare_logical_zero, split_dual_rail_register
-from .ops import swap_dual_rail
+from .ops import swap_dual_rail, swap_dual_rail_instructions
 from .router import DualRailRouterNode, ft_router
+from .utils import depth_from_address
 
 
 class SyndromeTracker:
@@ -37,6 +43,29 @@ class ReuseSyndromeTracker:
         return self.creg[0]
 
 
+class PoolSyndromeTracker:
+    """Cycles through a fixed pool of classical bits (round-robin overwrite)."""
+
+    def __init__(self, creg: ClassicalRegister) -> None:
+        self.creg = creg
+        self.index = 0
+
+    def next(self):
+        bit = self.creg[self.index % len(self.creg)]
+        self.index += 1
+        return bit
+
+
+class _PrefetchedSyndromeTracker:
+    """Replays syndrome bits that were allocated ahead of time."""
+
+    def __init__(self, bits: List) -> None:
+        self._bits = iter(bits)
+
+    def next(self):
+        return next(self._bits)
+
+
 def _router_calls_for_depth(depth: int) -> int:
     """Number of router calls up to (but not including) a given depth."""
 
@@ -54,64 +83,118 @@ class DualRailQram:
 
     def __init__(
         self,
-        address,
-        data: List[int],
+        depth: Union[int, List[str], None] = None,
+        data: Optional[List[int]] = None,
         *regs,
         bandwidth: int = 1,
         record_syndrome: bool = True,
         prepare_bus: bool = True,
+        parametric_data: bool = False,
+        parallel_layers: bool = False,
+        max_workers: Optional[int] = None,
+        syndrome_mode: Optional[Literal["full", "reuse", "pool"]] = None,
+        syndrome_pool_size: Optional[int] = None,
+        address: Union[int, List[str], None] = None,
     ) -> None:
-        self.address = address
+        if data is None:
+            raise TypeError("DualRailQram() missing required argument: 'data'")
         self.data = data
         self.bandwidth = bandwidth
         self.record_syndrome = record_syndrome
+        # "full" keeps every syndrome bit, "reuse" overwrites a single bit and
+        # "pool" cycles through syndrome_pool_size bits (default 5 per level).
+        # Without an explicit mode, record_syndrome picks "full" or "reuse".
+        if syndrome_mode is None:
+            syndrome_mode = "full" if record_syndrome else "reuse"
+        if syndrome_mode not in ("full", "reuse", "pool"):
+            raise ValueError("syndrome_mode must be 'full', 'reuse' or 'pool'")
+        if syndrome_pool_size is not None and syndrome_pool_size < 1:
+            raise ValueError("syndrome_pool_size must be at least 1")
+        self.syndrome_mode = syndrome_mode
+        self.syndrome_pool_size = syndrome_pool_size
         self.prepare_bus = prepare_bus
-
-        self.depth = self._infer_depth(address)
+        # With parallel_layers each router layer is built as per-node
+        # subcircuits on a thread pool of max_workers threads (None: the
+        # ThreadPoolExecutor default) and stitched back in tree order. The
+        # result matches the sequential build, but the subcircuit and compose
+        # overhead makes it slower under the GIL: 0.08 s vs 0.03 s at depth 6
+        # and 0.45 s vs 0.24 s at depth 8.
+        self.parallel_layers = parallel_layers
+        self.max_workers = max_workers
+
+        # address is the pre-depth name of the first argument, kept as a deprecated alias.
+        self._address = depth if address is None else address
+        self.depth = depth_from_address(depth, address)
         if len(data) != (1 << self.depth):
             raise ValueError("data length must be 2^address_bits")
+        # Leaf i serves data[2i] (left branch) and data[2i + 1] (right branch).
+        data_bits = np.asarray(data) == 1
+        self._left_hits = np.flatnonzero(data_bits[0::2])
+        self._right_hits = np.flatnonzero(data_bits[1::2])
+
+        # With parametric data the memory phases are CP(pi * d_i) gates, so one
+        # (transpiled) circuit can be rebound to any data table via bind_data().
+        self.data_params: Optional[ParameterVector] = (
+            ParameterVector("data", len(data)) if parametric_data else None
+        )
 
-        self.routers: List[List[DualRailRouterNode]] = [
-            [] for _ in range(self.depth)
-        ]
-        self.root = self._build_tree(level=0, direction="", parent=None)
+        self.nodes: List[DualRailRouterNode] = []
+        self.routers: List[List[DualRailRouterNode]] = []
+        self.root = self._build_tree()
 
         self.circuit = QuantumCircuit(*regs) if regs else None
         self.syndrome_tracker: Optional[SyndromeTracker] = None
 
-    def _infer_depth(self, address) -> int:
-        if isinstance(address, int):
-            return address
-        if isinstance(address, list) and address:
-            return len(address[0])
-        raise ValueError("address must be an int or list of binary strings")
-
-    def _build_tree(
-        self, level: int, direction: str, parent: Optional[DualRailRouterNode]
-    ) -> DualRailRouterNode:
-        node = DualRailRouterNode(
-            index=len(self.routers[level]),
-            level=level,
-            direction=direction,
-            parent=parent,
-        )
-        self.routers[level].append(node)
-        if level < self.depth - 1:
-            node.left = self._build_tree(level + 1, "0", node)
-            node.right = self._build_tree(level + 1, "1", node)
-        return node
+    @property
+    def address(self) -> Union[int, List[str]]:
+        """The depth (or deprecated address list) this QRAM was built from."""
 
-    def add_router_tree(self, circuit: QuantumCircuit) -> None:
-        """Attach all router registers to the circuit."""
+        return self._address
 
-        def walk(node: DualRailRouterNode) -> None:
-            node.add_registers(circuit)
-            if node.left is not None:
-                walk(node.left)
-            if node.right is not None:
-                walk(node.right)
+    def _build_tree(self) -> DualRailRouterNode:
+        """Allocate the router tree level by level; returns the root.
+
+        Nodes are stored flat in heap order: (level, i) lives at
+        nodes[2^level - 1 + i], has address bin(i) and children 2i, 2i + 1.
+        self.routers holds the per-level slices of that array.
+        """
 
-        walk(self.root)
+        self.nodes = [None] * ((1 << self.depth) - 1)
+        for pos in range(len(self.nodes)):
+            level = (pos + 1).bit_length() - 1
+            i = pos - ((1 << level) - 1)
+            parent = self.nodes[(pos - 1) >> 1] if pos else None
+            node = DualRailRouterNode(
+                index=i,
+                level=level,
+                direction="" if parent is None else str(i & 1),
+                parent=parent,
+            )
+            if parent is not None:
+                if i & 1:
+                    parent.right = node
+                else:
+                    parent.left = node
+            self.nodes[pos] = node
+        self.routers = [self.nodes[(1 << level) - 1 : (2 << level) - 1] for level in range(self.depth)]
+        return self.nodes[0]
+
+    def add_router_tree(self, circuit: QuantumCircuit) -> None:
+        """Attach all router registers to the circuit in one add_register call."""
+
+        # Iterative pre-order DFS; right is pushed first so left is visited first.
+        regs: List[QuantumRegister] = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            regs.extend(node.registers)
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+        # Set lookup keeps this linear in the number of registers.
+        known = set(circuit.qregs)
+        circuit.add_register(*[reg for reg in regs if reg not in known])
 
     def __call__(self, *args) -> QuantumCircuit:
         """Build the QRAM circuit.
@@ -131,14 +214,23 @@ class DualRailQram:
 
         # Attach router resources
         self.add_router_tree(circuit)
+        # Router ancillas start in |0>, so their first reset can be skipped.
+        self._fresh_routers = {(node.level, node.index) for level in self.routers for node in level}
 
         # Syndrome register
-        if self.record_syndrome:
+        if self.syndrome_mode == "full":
             bits_per_router = 5
             total_router_calls = self._estimate_router_calls()
             creg = ClassicalRegister(bits_per_router * total_router_calls, "syndrome")
             circuit.add_register(creg)
             self.syndrome_tracker = SyndromeTracker(creg)
+        elif self.syndrome_mode == "pool":
+            pool_size = self.syndrome_pool_size
+            if pool_size is None:
+                pool_size = 5 * max(self.depth, 1)
+            creg = ClassicalRegister(pool_size, "syndrome")
+            circuit.add_register(creg)
+            self.syndrome_tracker = PoolSyndromeTracker(creg)
         else:
             creg = ClassicalRegister(1, "syndrome")
             circuit.add_register(creg)
@@ -147,23 +239,32 @@ class DualRailQram:
         # Store external references
         self.address_reg = address_reg
         self.bus_reg = bus_reg
+        # Split once per build; the store, query and restore passes all reuse these.
+        self._address_pairs_cached = split_dual_rail_register(address_reg)
+        self._bus_pairs_cached = split_dual_rail_register(bus_reg)
 
         # Build the algorithm
         self.decompose_circuit()
         return circuit
 
     def _estimate_router_calls(self) -> int:
-        # Store address bits
-        total = 0
-        for i in range(self.depth):
-            total += 2 * _router_calls_for_depth(i)
-        # Route bus down + up
-        total += 2 * _router_calls_for_depth(self.depth - 1)
-        # Restore address bits
-        for i in range(self.depth):
-            total += 2 * _router_calls_for_depth(i)
+        d = self.depth
+        # Storing and restoring address bit i each route down + up through
+        # the 2^i - 1 routers above level i: sum over i < d is 2^d - 1 - d.
+        address = 4 * ((1 << d) - 1 - d)
+        # Route bus down + up to the leaf level
+        bus = 2 * _router_calls_for_depth(d - 1)
         # Ensure at least 1 to avoid zero-sized creg
-        return max(total, 1)
+        return max(address + bus, 1)
+
+    def _take_fresh(self, node: DualRailRouterNode) -> bool:
+        """True on the first router call of a node (its ancillas are still |0>)."""
+
+        key = (node.level, node.index)
+        if key in self._fresh_routers:
+            self._fresh_routers.remove(key)
+            return True
+        return False
 
     def _router(self, node: DualRailRouterNode) -> None:
         if node.left is None or node.right is None:
@@ -177,31 +278,64 @@ class DualRailQram:
             node.flag,
             node.parity,
             self.syndrome_tracker,
+            fresh_ancillas=self._take_fresh(node),
         )
 
-    def _route_down(self, node: DualRailRouterNode, target_depth: int) -> None:
-        if node.level >= target_depth:
-            return
-        self._router(node)
-        if node.left is not None:
-            self._route_down(node.left, target_depth)
-        if node.right is not None:
-            self._route_down(node.right, target_depth)
-
-    def _route_up(self, node: DualRailRouterNode, target_depth: int) -> None:
-        if node.level >= target_depth:
+    def _router_subcircuit(self, node: DualRailRouterNode, bits: List, fresh: bool) -> QuantumCircuit:
+        """Build one router call into a standalone circuit over the node's bits."""
+
+        sub = QuantumCircuit(
+            node.addr_reg, node.bus_reg, node.left.bus_reg, node.right.bus_reg, node.flag_reg, node.parity_reg
+        )
+        sub.add_bits(list(dict.fromkeys(bits)))
+        ft_router(
+            sub,
+            node.addr,
+            node.bus,
+            node.left.bus,
+            node.right.bus,
+            node.flag,
+            node.parity,
+            _PrefetchedSyndromeTracker(bits),
+            fresh_ancillas=fresh,
+        )
+        return sub
+
+    def _route_layer_parallel(self, nodes: List[DualRailRouterNode]) -> None:
+        nodes = [node for node in nodes if node.left is not None and node.right is not None]
+        # Syndrome bits are allocated up front, in tree order, so the result
+        # matches a sequential build of the same layer.
+        bits = [[self.syndrome_tracker.next() for _ in range(5)] for _ in nodes]
+        fresh = [self._take_fresh(node) for node in nodes]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            subs = list(pool.map(self._router_subcircuit, nodes, bits, fresh))
+        for sub in subs:
+            self.circuit.compose(sub, qubits=sub.qubits, clbits=sub.clbits, inplace=True)
+
+    def _route_layer(self, nodes: List[DualRailRouterNode]) -> None:
+        if self.parallel_layers:
+            self._route_layer_parallel(nodes)
             return
-        if node.left is not None:
-            self._route_up(node.left, target_depth)
-        if node.right is not None:
-            self._route_up(node.right, target_depth)
-        self._router(node)
+        for node in nodes:
+            self._router(node)
+
+    def _route_down(self, root: DualRailRouterNode, target_depth: int) -> None:
+        """Apply the routers of every level above target_depth, top level first."""
+
+        for level in range(root.level, target_depth):
+            self._route_layer(self.routers[level])
+
+    def _route_up(self, root: DualRailRouterNode, target_depth: int) -> None:
+        """Undo _route_down: the same routers, deepest level first."""
+
+        for level in reversed(range(root.level, target_depth)):
+            self._route_layer(self.routers[level])
 
     def _address_pairs(self) -> List[DualRailPair]:
-        return split_dual_rail_register(self.address_reg)
+        return self._address_pairs_cached
 
     def _bus_pairs(self) -> List[DualRailPair]:
-        return split_dual_rail_register(self.bus_reg)
+        return self._bus_pairs_cached
 
     def _store_address_bits(self) -> None:
         address_pairs = self._address_pairs()
@@ -213,11 +347,18 @@ class DualRailQram:
             # Route down to the target depth
             self._route_down(self.root, target_depth=level)
             # Store the address bit into routers at this level
-            for node in self.routers[level]:
-                swap_dual_rail(self.circuit, node.bus, node.addr)
+            self._swap_layer_bus_addr(level)
             # Route back up, leaving root bus empty
             self._route_up(self.root, target_depth=level)
 
+    def _swap_layer_bus_addr(self, level: int) -> None:
+        """Swap bus and address pair of every router on a level, as one batch."""
+
+        emit.extend(
+            self.circuit,
+            [inst for node in self.routers[level] for inst in swap_dual_rail_instructions(node.bus, node.addr)],
+        )
+
     def _restore_address_bits(self) -> None:
         address_pairs = self._address_pairs()
         root_bus = self.root.bus
@@ -225,8 +366,7 @@ class DualRailQram:
         for level in reversed(range(self.depth)):
             # Route empty root bus down to reach stored address bits
             self._route_down(self.root, target_depth=level)
-            for node in self.routers[level]:
-                swap_dual_rail(self.circuit, node.bus, node.addr)
+            self._swap_layer_bus_addr(level)
             self._route_up(self.root, target_depth=level)
             # Restore to external address register
             swap_dual_rail(self.circuit, address_pairs[level], root_bus)
@@ -237,20 +377,23 @@ class DualRailQram:
         if self.depth == 0:
             return
 
-        for node in self.routers[-1]:
-            prefix = node.address
-            left_addr = prefix + "0"
-            right_addr = prefix + "1"
-            left_idx = int(left_addr, 2)
-            right_idx = int(right_addr, 2)
-
-            # Encode classical memory bits as phase flips on the bus logical |1_L> rail.
-            if self.data[left_idx] == 1:
-                # Address last bit = 0 -> addr.rail1 is active
-                self.circuit.cz(node.addr.rail1, node.bus.rail0)
-            if self.data[right_idx] == 1:
-                # Address last bit = 1 -> addr.rail0 is active
-                self.circuit.cz(node.addr.rail0, node.bus.rail0)
+        leaves = self.routers[-1]
+        if self.data_params is not None:
+            # Leaf k sits at address prefix k, so it serves data[2k] and data[2k + 1].
+            for k, node in enumerate(leaves):
+                left_idx = 2 * k
+                self.circuit.cp(np.pi * self.data_params[left_idx], node.addr.rail1, node.bus.rail0)
+                self.circuit.cp(np.pi * self.data_params[left_idx | 1], node.addr.rail0, node.bus.rail0)
+            return
+
+        # Encode classical memory bits as phase flips on the bus logical |1_L> rail.
+        # Only leaves whose data bit is set are visited.
+        for i in self._left_hits:
+            # Address last bit = 0 -> addr.rail1 is active
+            emit.cz(self.circuit, leaves[i].addr.rail1, leaves[i].bus.rail0)
+        for i in self._right_hits:
+            # Address last bit = 1 -> addr.rail0 is active
+            emit.cz(self.circuit, leaves[i].addr.rail0, leaves[i].bus.rail0)
 
     def _route_bus_query(self) -> None:
         root_bus = self.root.bus
@@ -274,3 +417,68 @@ class DualRailQram:
         self._store_address_bits()
         self._route_bus_query()
         self._restore_address_bits()
+
+    def bind_data(self, circuit: QuantumCircuit, data: Optional[List[int]] = None) -> QuantumCircuit:
+        """Return a copy of a parametric-data circuit bound to a data table.
+
+        circuit may be the built circuit or any transpiled version of it.
+        """
+
+        if self.data_params is None:
+            raise ValueError("bind_data requires parametric_data=True")
+        data = self.data if data is None else data
+        if len(data) != len(self.data_params):
+            raise ValueError("data length must be 2^address_bits")
+        return circuit.assign_parameters({self.data_params: list(data)})
+
+
+@lru_cache(maxsize=None)
+def _build_qram_template(depth: int, record_syndrome: bool, prepare_bus: bool) -> Tuple[DualRailQram, QuantumCircuit]:
+    """Build (once per configuration) a parametric-data QRAM on addr_dr/bus_dr registers."""
+
+    qram = DualRailQram(
+        depth,
+        [0] * (1 << depth),
+        record_syndrome=record_syndrome,
+        prepare_bus=prepare_bus,
+        parametric_data=True,
+    )
+    circuit = qram(QuantumRegister(2 * depth, "addr_dr"), QuantumRegister(2, "bus_dr"))
+    return qram, circuit
+
+
+@lru_cache(maxsize=8)
+def _transpiled_qram_template(
+    depth: int,
+    record_syndrome: bool,
+    prepare_bus: bool,
+    basis_gates: Tuple[str, ...],
+) -> QuantumCircuit:
+    """Transpile the cached template once per basis; the data parameters survive."""
+
+    from qiskit import transpile
+
+    _, circuit = _build_qram_template(depth, record_syndrome, prepare_bus)
+    return transpile(circuit, basis_gates=list(basis_gates), optimization_level=0)
+
+
+def query_circuit(
+    depth: int,
+    data: List[int],
+    record_syndrome: bool = True,
+    prepare_bus: bool = True,
+    basis_gates: Optional[Tuple[str, ...]] = None,
+) -> QuantumCircuit:
+    """QRAM query circuit for data, reusing a cached data-independent build.
+
+    The router tree, registers and routing passes depend only on depth and
+    the options, so they are built once; each call only binds the CP(pi*d_i)
+    memory phases. With basis_gates the cached template is also transpiled
+    once, so repeated queries never rerun the transpiler. Qubits are ordered
+    as the addr_dr register followed by bus_dr, then the router registers.
+    """
+
+    qram, circuit = _build_qram_template(depth, record_syndrome, prepare_bus)
+    if basis_gates is not None:
+        circuit = _transpiled_qram_template(depth, record_syndrome, prepare_bus, tuple(basis_gates))
+    return qram.bind_data(circuit, data)
@@ -7,25 +7,58 @@ Dual-rail encoding:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Union
 
 import numpy as np
 from qiskit import QuantumCircuit, QuantumRegister
 from qiskit.circuit import Qubit
-from qiskit.circuit.library import UnitaryGate
+
+from . import emit
 
 
-@dataclass(frozen=True)
 class DualRailPair:
     """A lightweight view of a dual-rail logical qubit.
 
     rail0 and rail1 are physical qubits. rail0 corresponds to logical |1_L>.
+    Immutable and slotted, since pairs are created for every router node.
     """
 
+    __slots__ = ("rail0", "rail1", "name")
+
     rail0: Qubit
     rail1: Qubit
-    name: str = ""
+    name: str
+
+    def __init__(self, rail0: Qubit, rail1: Qubit, name: str = "") -> None:
+        object.__setattr__(self, "rail0", rail0)
+        object.__setattr__(self, "rail1", rail1)
+        object.__setattr__(self, "name", name)
+
+    def __setattr__(self, key, value) -> None:
+        raise AttributeError(f"cannot assign to field '{key}'")
+
+    def __delattr__(self, key) -> None:
+        raise AttributeError(f"cannot delete field '{key}'")
+
+    # copy and pickle restore slots through setattr by default, which is blocked above.
+    def __getstate__(self):
+        return (self.rail0, self.rail1, self.name)
+
+    def __setstate__(self, state) -> None:
+        for key, value in zip(self.__slots__, state):
+            object.__setattr__(self, key, value)
+
+    def __repr__(self) -> str:
+        return f"DualRailPair(rail0={self.rail0!r}, rail1={self.rail1!r}, name={self.name!r})"
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.rail0, self.rail1, self.name) == (other.rail0, other.rail1, other.name)
+
+    def __hash__(self) -> int:
+        return hash((self.rail0, self.rail1, self.name))
 
 
 def make_dual_rail_register(name: str) -> QuantumRegister:
@@ -54,46 +87,102 @@ def split_dual_rail_register(qreg: QuantumRegister) -> List[DualRailPair]:
     return pairs
 
 
-# Logical Hadamard acting on the single-excitation subspace.
-# Basis order: |00>, |01>, |10>, |11>
-_LOGICAL_H_MATRIX = np.array(
-    [
-        [1.0, 0.0, 0.0, 0.0],
-        [0.0, 1.0 / np.sqrt(2), 1.0 / np.sqrt(2), 0.0],
-        [0.0, 1.0 / np.sqrt(2), -1.0 / np.sqrt(2), 0.0],
-        [0.0, 0.0, 0.0, 1.0],
-    ],
-    dtype=complex,
-)
-_LOGICAL_H_GATE = UnitaryGate(_LOGICAL_H_MATRIX, label="H_L")
-
-
 def logical_h(circuit: QuantumCircuit, pair: DualRailPair) -> None:
-    """Apply a logical Hadamard in the dual-rail code space."""
+    """Apply a logical Hadamard in the dual-rail code space.
 
-    circuit.append(_LOGICAL_H_GATE, [pair.rail0, pair.rail1])
+    In the basis |00>, |01>, |10>, |11> (rail0 is the low bit) this is
+    identity on |00> and |11> and H on span{|01>, |10>}. The CX pair maps
+    the code space onto rail0 = 1, where a controlled-H (Ry-CZ-Ry) acts
+    on rail1.
+    """
+
+    emit.cx(circuit, pair.rail1, pair.rail0)
+    emit.ry_quarter(circuit, pair.rail1, -1)
+    emit.cz(circuit, pair.rail0, pair.rail1)
+    emit.ry_quarter(circuit, pair.rail1)
+    emit.cx(circuit, pair.rail1, pair.rail0)
 
 
 def logical_x(circuit: QuantumCircuit, pair: DualRailPair) -> None:
     """Logical X swaps the rails."""
 
-    circuit.swap(pair.rail0, pair.rail1)
+    emit.swap(circuit, pair.rail0, pair.rail1)
 
 
 def logical_z(circuit: QuantumCircuit, pair: DualRailPair) -> None:
     """Logical Z applies Z to rail0 (|1_L> component)."""
 
-    circuit.z(pair.rail0)
+    emit.z(circuit, pair.rail0)
 
 
 def prepare_logical_zero(circuit: QuantumCircuit, pair: DualRailPair) -> None:
     """Prepare |0_L> = |01>. Assumes both rails start in |0>."""
 
-    circuit.x(pair.rail1)
+    emit.x(circuit, pair.rail1)
 
 
 def prepare_logical_one(circuit: QuantumCircuit, pair: DualRailPair) -> None:
     """Prepare |1_L> = |10>. Assumes both rails start in |0>."""
 
-    circuit.x(pair.rail0)
+    emit.x(circuit, pair.rail0)
+
+
+def _rails(pairs: Sequence[DualRailPair]) -> List[Qubit]:
+    return [qubit for pair in pairs for qubit in (pair.rail0, pair.rail1)]
+
+
+@lru_cache(maxsize=256)
+def _basis_template(values: Tuple[bool, ...]) -> QuantumCircuit:
+    template = QuantumCircuit(2 * len(values))
+    for i, value in enumerate(values):
+        emit.x(template, template.qubits[2 * i + (0 if value else 1)])
+    return template
+
+
+@lru_cache(maxsize=256)
+def _superposition_template(minus: Tuple[bool, ...]) -> QuantumCircuit:
+    template = QuantumCircuit(2 * len(minus))
+    rail0 = template.qubits[0::2]
+    rail1 = template.qubits[1::2]
+    template.h(rail0)
+    template.x(rail1)
+    template.cx(rail0, rail1)
+    flipped = [rail0[i] for i, flag in enumerate(minus) if flag]
+    if flipped:
+        template.z(flipped)
+    return template
+
+
+def initialize_dual_rail(
+    circuit: QuantumCircuit, pairs: Sequence[DualRailPair], logical_values: Union[Sequence[int], np.ndarray]
+) -> None:
+    """Prepare each pair in |0_L> or |1_L>. Assumes all rails start in |0>.
+
+    The X layer is built once per value pattern and composed in as a block.
+    """
+
+    values = np.asarray(logical_values, dtype=bool)
+    if values.shape != (len(pairs),):
+        raise ValueError("Need one logical value per dual-rail pair")
+    if len(pairs):
+        circuit.compose(_basis_template(tuple(values.tolist())), qubits=_rails(pairs), inplace=True)
+
+
+def initialize_dual_rail_superposition(
+    circuit: QuantumCircuit,
+    pairs: Sequence[DualRailPair],
+    minus: Union[Sequence[int], np.ndarray, None] = None,
+) -> None:
+    """Prepare each pair in |+_L> (or |-_L> where minus is set). Assumes all rails start in |0>.
+
+    H on rail0, X on rail1 and a CX from rail0 to rail1 give
+    (|0_L> + |1_L>)/sqrt(2) directly, three gates per pair rather than a
+    five-gate logical_h. The layer is built once per sign pattern and
+    composed in as a block.
+    """
 
+    flags = np.zeros(len(pairs), dtype=bool) if minus is None else np.asarray(minus, dtype=bool)
+    if flags.shape != (len(pairs),):
+        raise ValueError("Need one sign flag per dual-rail pair")
+    if len(pairs):
+        circuit.compose(_superposition_template(tuple(flags.tolist())), qubits=_rails(pairs), inplace=True)
@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 from qiskit import QuantumCircuit, QuantumRegister
 
+from . import emit
 from .ops import cswap_dual_rail, measure_conservation, measure_parity
 from .qubits import DualRailPair, make_dual_rail_register
 
@@ -24,46 +25,33 @@ class DualRailRouterNode:
     right: Optional["DualRailRouterNode"] = None
 
     def __post_init__(self) -> None:
+        # Computed once; the parent's address is already final at this point.
+        self.address = self.direction if self.parent is None else self.parent.address + self.direction
+        self._name_prefix = f"router_{self.level}_{self.address}" if self.address else f"router_{self.level}"
         # Dual-rail address storage and bus buffer.
         self.addr_reg = make_dual_rail_register(self.reg_name("addr"))
         self.bus_reg = make_dual_rail_register(self.reg_name("bus"))
         # Local ancillas for parity/flag checks.
         self.flag_reg = QuantumRegister(1, self.reg_name("flag"))
         self.parity_reg = QuantumRegister(1, self.reg_name("par"))
-
-    @property
-    def address(self) -> str:
-        if self.parent is None:
-            return self.direction
-        return self.parent.address + self.direction
+        # Pair/qubit views are read on every router call, so build them once.
+        self.addr = DualRailPair(self.addr_reg[0], self.addr_reg[1], self.addr_reg.name)
+        self.bus = DualRailPair(self.bus_reg[0], self.bus_reg[1], self.bus_reg.name)
+        self.flag = self.flag_reg[0]
+        self.parity = self.parity_reg[0]
 
     def reg_name(self, suffix: str) -> str:
-        if self.address:
-            return f"router_{self.level}_{self.address}_{suffix}"
-        return f"router_{self.level}_{suffix}"
-
-    @property
-    def addr(self) -> DualRailPair:
-        return DualRailPair(self.addr_reg[0], self.addr_reg[1], self.reg_name("addr"))
-
-    @property
-    def bus(self) -> DualRailPair:
-        return DualRailPair(self.bus_reg[0], self.bus_reg[1], self.reg_name("bus"))
-
-    @property
-    def flag(self):
-        return self.flag_reg[0]
+        return f"{self._name_prefix}_{suffix}"
 
     @property
-    def parity(self):
-        return self.parity_reg[0]
+    def registers(self) -> Tuple[QuantumRegister, ...]:
+        return (self.addr_reg, self.bus_reg, self.flag_reg, self.parity_reg)
 
     def add_registers(self, circuit: QuantumCircuit) -> None:
         """Attach this node's registers to a circuit (if missing)."""
 
-        for reg in (self.addr_reg, self.bus_reg, self.flag_reg, self.parity_reg):
-            if reg not in circuit.qregs:
-                circuit.add_register(reg)
+        known = set(circuit.qregs)
+        circuit.add_register(*[reg for reg in self.registers if reg not in known])
 
 
 def ft_router(
@@ -75,28 +63,32 @@ def ft_router(
     flag_qubit,
     parity_qubit,
     syndrome,
+    fresh_ancillas: bool = False,
 ) -> None:
     """Fault-tolerant dual-rail router with parity + flag checks.
 
     syndrome is a tracker that yields classical bits via syndrome.next().
+    fresh_ancillas marks flag/parity qubits that have not been used yet and
+    are therefore still in |0>; their first reset is skipped.
     """
 
     # 1) Pre-check: address must be one-hot (odd parity)
-    measure_parity(circuit, addr, parity_qubit, syndrome.next())
+    measure_parity(circuit, addr, parity_qubit, syndrome.next(), reset=not fresh_ancillas)
 
     # 2) Flagged routing to RIGHT (addr rail0)
-    circuit.reset(flag_qubit)
-    circuit.cx(addr.rail0, flag_qubit)
+    if not fresh_ancillas:
+        emit.reset(circuit, flag_qubit)
+    emit.cx(circuit, addr.rail0, flag_qubit)
     cswap_dual_rail(circuit, flag_qubit, bus, right_bus)
-    circuit.cx(addr.rail0, flag_qubit)
-    circuit.measure(flag_qubit, syndrome.next())
+    emit.cx(circuit, addr.rail0, flag_qubit)
+    emit.measure(circuit, flag_qubit, syndrome.next())
 
     # 3) Flagged routing to LEFT (addr rail1)
-    circuit.reset(flag_qubit)
-    circuit.cx(addr.rail1, flag_qubit)
+    emit.reset(circuit, flag_qubit)
+    emit.cx(circuit, addr.rail1, flag_qubit)
     cswap_dual_rail(circuit, flag_qubit, bus, left_bus)
-    circuit.cx(addr.rail1, flag_qubit)
-    circuit.measure(flag_qubit, syndrome.next())
+    emit.cx(circuit, addr.rail1, flag_qubit)
+    emit.measure(circuit, flag_qubit, syndrome.next())
 
     # 4) Post-check: conservation between outputs
     measure_conservation(
@@ -0,0 +1,232 @@
+"""Aer simulation helpers that pick the cheapest exact method."""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from qiskit import QuantumCircuit
+
+# Operations the stabilizer method simulates exactly.
+CLIFFORD_OPS = frozenset(
+    {
+        "id",
+        "x",
+        "y",
+        "z",
+        "h",
+        "s",
+        "sdg",
+        "sx",
+        "sxdg",
+        "cx",
+        "cy",
+        "cz",
+        "swap",
+        "measure",
+        "reset",
+        "barrier",
+    }
+)
+
+
+def is_clifford(circuit: QuantumCircuit) -> bool:
+    """True if every operation is Clifford, looking through composite gates."""
+
+    for instruction in circuit.data:
+        operation = instruction.operation
+        if operation.name in CLIFFORD_OPS:
+            continue
+        definition = getattr(operation, "definition", None)
+        if definition is None or not is_clifford(definition):
+            return False
+    return True
+
+
+# Largest circuit whose noisy runs evolve the density matrix (4^n amplitudes).
+DENSITY_MATRIX_MAX_QUBITS = 12
+
+
+def simulation_method(circuit: QuantumCircuit, noisy: bool = False) -> str:
+    """Aer method for circuit: polynomial-time stabilizer when possible.
+
+    Otherwise noiseless runs use one statevector simulation (Aer samples all
+    shots from it when measurements are final). Noisy runs on up to
+    DENSITY_MATRIX_MAX_QUBITS qubits evolve the exact density matrix; larger
+    ones sample one statevector noise trajectory per shot, which needs 2^n
+    rather than 4^n memory.
+    """
+
+    if is_clifford(circuit):
+        return "stabilizer"
+    return _noisy_method(circuit) if noisy else "statevector"
+
+
+def _noisy_method(circuit: QuantumCircuit) -> str:
+    return "density_matrix" if circuit.num_qubits <= DENSITY_MATRIX_MAX_QUBITS else "statevector"
+
+
+@lru_cache(maxsize=None)
+def _simulator(method: str):
+    """One AerSimulator per method, reused across runs.
+
+    Batched jobs run their experiments in parallel; Aer splits the threads
+    between experiments and each experiment's own state updates. Set
+    QRAM_AER_THREADS to cap the threads per process (0, the default, uses
+    every core), e.g. when several processes simulate at once.
+    """
+
+    from qiskit_aer import AerSimulator
+
+    threads = int(os.environ.get("QRAM_AER_THREADS", "0"))
+    return AerSimulator(method=method, max_parallel_experiments=0, max_parallel_threads=threads)
+
+
+def _light_cone(circuit: QuantumCircuit, qubits: Sequence) -> QuantumCircuit:
+    """circuit without the operations that cannot reach qubits.
+
+    An operation is kept when it shares a qubit with a later kept operation
+    or with qubits, walking backwards. The dropped ones act only on qubits
+    traced out at the end, and every operation here is trace preserving, so
+    the state of qubits is unchanged. Barriers are dropped rather than letting
+    them join every qubit into the cone.
+    """
+
+    active = set(qubits)
+    keep = [False] * len(circuit.data)
+    for index in range(len(circuit.data) - 1, -1, -1):
+        instruction = circuit.data[index]
+        if instruction.operation.name == "barrier":
+            continue
+        if any(qubit in active for qubit in instruction.qubits):
+            keep[index] = True
+            active.update(instruction.qubits)
+    if all(keep):
+        return circuit
+    pruned = circuit.copy_empty_like()
+    for instruction, kept in zip(circuit.data, keep):
+        if kept:
+            pruned.append(instruction)
+    return pruned
+
+
+def exact_distribution(circuit: QuantumCircuit, noise_model=None) -> Dict[str, float]:
+    """Exact outcome probabilities of a circuit, keyed like Aer counts.
+
+    All measurements must come after the last gate on their qubit. Without
+    a noise model or resets one stabilizer (Clifford circuits) or
+    statevector evolution replaces shot sampling; otherwise Aer evolves the
+    density matrix through the noise channels and resets instead of sampling
+    trajectories, on at most DENSITY_MATRIX_MAX_QUBITS active qubits (larger
+    ones raise ValueError). Unmeasured clbits read 0.
+    """
+
+    # Index maps built once; the loop below would otherwise look up every measurement.
+    qubit_index = {bit: i for i, bit in enumerate(circuit.qubits)}
+    clbit_index = {bit: i for i, bit in enumerate(circuit.clbits)}
+    body = circuit.copy_empty_like()
+    measured: Dict[int, int] = {}
+    measured_qubits = set()
+    for instruction in circuit.data:
+        if instruction.operation.name == "barrier":
+            continue
+        if instruction.operation.name == "measure":
+            qubit = instruction.qubits[0]
+            measured[clbit_index[instruction.clbits[0]]] = qubit_index[qubit]
+            measured_qubits.add(qubit)
+            continue
+        if any(qubit in measured_qubits for qubit in instruction.qubits):
+            raise ValueError("exact_distribution needs all measurements at the end")
+        body.append(instruction)
+
+    clbits = sorted(measured)
+    qargs = [measured[clbit] for clbit in clbits]
+    # Gates on qubits that never reach a measured one are left out.
+    body = _light_cone(body, [body.qubits[q] for q in qargs])
+    # A reset on the pure-state methods samples one branch; the density matrix keeps both.
+    mixed = noise_model is not None or any(instruction.operation.name == "reset" for instruction in body.data)
+    if mixed:
+        # Aer drops idle qubits, so only the ones the body acts on count.
+        active = {qubit for instruction in body.data for qubit in instruction.qubits}
+        active.update(body.qubits[q] for q in qargs)
+        if len(active) > DENSITY_MATRIX_MAX_QUBITS:
+            raise ValueError(
+                f"exact_distribution would evolve a density matrix on {len(active)} qubits "
+                f"(limit {DENSITY_MATRIX_MAX_QUBITS}); sample with run_counts instead"
+            )
+        method = "density_matrix"
+    else:
+        method = "stabilizer" if is_clifford(body) else "statevector"
+    # Aer stores the marginal over qargs in one pass; no shots are sampled.
+    from qiskit_aer.library import SaveProbabilities
+
+    body.append(SaveProbabilities(len(qargs), label="probabilities"), qargs)
+    simulator = _simulator(method)
+    options = {} if noise_model is None else {"noise_model": noise_model}
+    result = simulator.run(body, shots=1, **options).result()
+    probabilities = np.asarray(result.data(0)["probabilities"])
+
+    # Aer prints one group per classical register, last register first and
+    # each register's highest bit first.
+    if circuit.cregs:
+        groups = [[clbit_index[bit] for bit in reversed(creg)] for creg in reversed(circuit.cregs)]
+    else:
+        groups = [list(range(circuit.num_clbits - 1, -1, -1))]
+    distribution: Dict[str, float] = {}
+    for outcome in np.flatnonzero(probabilities > 1e-12):
+        values = ["0"] * circuit.num_clbits
+        for j, clbit in enumerate(clbits):
+            values[clbit] = "1" if (outcome >> j) & 1 else "0"
+        key = " ".join("".join(values[i] for i in group) for group in groups)
+        distribution[key] = float(probabilities[outcome])
+    return distribution
+
+
+def run_counts(
+    circuits: Union[QuantumCircuit, Sequence[QuantumCircuit]],
+    shots: int,
+    seed: Optional[int] = None,
+    noise_model=None,
+) -> Union[Dict[str, int], List[Dict[str, int]]]:
+    """Sample circuits on Aer with simulation_method and return their counts.
+
+    Like Result.get_counts, a single circuit gives one counts dict and a list
+    gives a list; a list is run as one Aer job per simulation method. Aer
+    runs the circuits as built, without transpiling. Set QRAM_TRANSPILE=1
+    to transpile against the simulator first (optimization_level=0), for
+    regression checks. Noisy Clifford circuits try the stabilizer method
+    first and fall back to simulation_method's non-Clifford choice when the
+    noise model is not Pauli-representable.
+    """
+
+    if isinstance(circuits, QuantumCircuit):
+        return run_counts([circuits], shots, seed, noise_model)[0]
+
+    by_method: Dict[str, List[int]] = {}
+    for index, circuit in enumerate(circuits):
+        by_method.setdefault(simulation_method(circuit, noisy=noise_model is not None), []).append(index)
+
+    options = {} if seed is None else {"seed_simulator": seed}
+    if noise_model is not None:
+        options["noise_model"] = noise_model
+    counts: List[Optional[Dict[str, int]]] = [None] * len(circuits)
+    for method, indices in by_method.items():
+        simulator = _simulator(method)
+        if os.environ.get("QRAM_TRANSPILE") == "1":
+            from qiskit import transpile
+
+            # Translation to the simulator's gate set is all the check needs.
+            batch = transpile([circuits[i] for i in indices], simulator, optimization_level=0)
+        else:
+            batch = [circuits[i] for i in indices]
+        result = simulator.run(batch, shots=shots, **options).result()
+        if not result.success and method == "stabilizer" and noise_model is not None:
+            # e.g. thermal relaxation becomes a Kraus channel the stabilizer method rejects.
+            fallback = _simulator(_noisy_method(max(batch, key=lambda c: c.num_qubits)))
+            result = fallback.run(batch, shots=shots, **options).result()
+        # By position: get_counts(circuit) looks up by name, which need not be unique.
+        for j, i in enumerate(indices):
+            counts[i] = result.get_counts(j)
+    return counts
@@ -0,0 +1,41 @@
+"""Small helpers shared by the QRAM builders."""
+
+from __future__ import annotations
+
+import warnings
+from numbers import Integral
+from typing import List, Union
+
+
+def depth_from_address(
+    depth: Union[int, List[str], None] = None,
+    address: Union[int, List[str], None] = None,
+) -> int:
+    """Tree depth from depth, or from the deprecated address argument.
+
+    Either may be the number of address bits or (deprecated) a list of
+    address strings, whose first entry gives the bit count.
+    """
+
+    if address is not None:
+        if depth is not None:
+            raise TypeError("pass depth or address, not both")
+        warnings.warn(
+            "The address argument is deprecated; pass depth (the number of address bits) instead",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+        depth = address
+    elif depth is None:
+        raise TypeError("missing required argument: 'depth'")
+    if isinstance(depth, Integral):
+        return int(depth)
+    if isinstance(depth, list) and depth:
+        if address is None:
+            warnings.warn(
+                "Passing a list of address strings is deprecated; pass the number of address bits instead",
+                DeprecationWarning,
+                stacklevel=3,
+            )
+        return len(depth[0])
+    raise ValueError("depth must be an int or list of binary strings")
@@ -1,13 +1,15 @@
+import os
+
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister, transpile
-from qiskit_aer import Aer
 
-from ftqram.dual_rail import DualRailQram, logical_h, prepare_logical_zero, split_dual_rail_register
+from ftqram.dual_rail import DualRailQram, initialize_dual_rail_superposition, split_dual_rail_register
+from ftqram.dual_rail.counts import shot_categories
+from ftqram.dual_rail.simulate import run_counts
 
 
 def run_dual_rail_demo():
     # Same address/data as bucktele.py
     address_bits = 3
-    address_list = [bin(i)[2:].zfill(address_bits) for i in range(2**address_bits)]
     data = [0, 0, 1, 1, 1, 0, 0, 1]
 
     # Dual-rail registers: 2 qubits per logical bit
@@ -17,11 +19,9 @@ def run_dual_rail_demo():
     circuit = QuantumCircuit(address_reg, bus_reg)
 
     # Prepare address register in equal superposition |+>_L for each bit
-    for pair in split_dual_rail_register(address_reg):
-        prepare_logical_zero(circuit, pair)
-        logical_h(circuit, pair)
+    initialize_dual_rail_superposition(circuit, split_dual_rail_register(address_reg))
 
-    qram = DualRailQram(address_list, data, bandwidth=1, record_syndrome=True, prepare_bus=True)
+    qram = DualRailQram(address_bits, data, bandwidth=1, record_syndrome=True, prepare_bus=True)
     qram(circuit, address_reg, bus_reg)
 
     # Measurements
@@ -32,16 +32,28 @@ def run_dual_rail_demo():
     circuit.measure(address_reg, addr_c)
     circuit.measure(bus_reg, bus_c)
 
-    simulator = Aer.get_backend("qasm_simulator")
-    result = simulator.run(circuit, shots=2000).result()
-    counts = result.get_counts(circuit)
+    # Uses the stabilizer method when the circuit is Clifford.
+    shots = 2000
+    counts = run_counts(circuit, shots)
 
     print("Dual-rail FT-QRAM counts (raw):")
     print(counts)
-
-    transpiled = transpile(circuit, basis_gates=["rx", "rz", "cz"], optimization_level=2)
-    print("Transpiled depth:", transpiled.depth())
-    print("Gate counts:", transpiled.count_ops())
+    syndrome_reg = next(reg for reg in circuit.cregs if reg.name == "syndrome")
+    categories = shot_categories(counts, circuit, syndrome_reg, [addr_c, bus_c])
+    print("Flagged shot rate:", categories["flagged"] / shots)
+    print("Accepted shot rate:", categories["accepted"] / shots)
+
+    # Transpiling is only needed for native-gate statistics; set
+    # REPORT_TRANSPILED=1 to include them.
+    if os.environ.get("REPORT_TRANSPILED"):
+        # The routing network is already laid out by hand; only translate to the
+        # native basis and skip the resynthesis passes of higher levels.
+        transpiled = transpile(circuit, basis_gates=["rx", "rz", "cz"], optimization_level=0)
+        print("Transpiled depth:", transpiled.depth())
+        print("Gate counts:", transpiled.count_ops())
+    else:
+        print("Depth:", circuit.depth())
+        print("Gate counts:", circuit.count_ops())
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ import math
 import os
 import random
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
@@ -9,17 +10,20 @@ ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
-from qiskit_aer import Aer
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister, transpile
 
 from bucktele import Qram as BuckQram, RouterQubit
 from ftqram.dual_rail import (
     DualRailBucketQram,
     DualRailQram,
-    logical_h,
-    prepare_logical_zero,
+    initialize_dual_rail,
+    initialize_dual_rail_superposition,
     split_dual_rail_register,
 )
+from ftqram.dual_rail.counts import counts_to_bit_array, register_bit_indices
+from ftqram.dual_rail.qram import query_circuit
+from ftqram.dual_rail.simulate import exact_distribution, run_counts
 
 
 @dataclass
@@ -31,18 +35,17 @@ class CaseResult:
     passed: bool
 
 
-class RegisterProxy:
-    """Proxy to provide legacy _size attribute for bucktele.Qram."""
+class LegacyQuantumRegister(QuantumRegister):
+    """QuantumRegister exposing the legacy _size attribute bucktele.Qram reads.
 
-    def __init__(self, qreg: QuantumRegister) -> None:
-        self._qreg = qreg
-        self._size = len(qreg)
+    Indexing goes straight to the register, without a forwarding proxy.
+    """
 
-    def __len__(self) -> int:
-        return len(self._qreg)
+    __slots__ = ()
 
-    def __getitem__(self, idx):
-        return self._qreg[idx]
+    @property
+    def _size(self) -> int:
+        return self.size
 
 
 def build_bucktele_tree(qram: BuckQram, address_bits: int) -> None:
@@ -77,25 +80,29 @@ def build_bucktele_tree(qram: BuckQram, address_bits: int) -> None:
         node.add_data_qubits(qram.circuit)
 
 
-def _bitstring_to_rev(bitstring: str) -> str:
-    compact = bitstring.replace(" ", "")
-    return compact[::-1]
+def _bits_to_int(bits: np.ndarray) -> np.ndarray:
+    """Row-wise integer value of little-endian bit columns."""
 
+    return bits.astype(np.int64) @ (1 << np.arange(bits.shape[1], dtype=np.int64))
 
-def _reg_bit_indices(circuit: QuantumCircuit, reg: ClassicalRegister) -> List[int]:
-    return [circuit.clbits.index(reg[i]) for i in range(len(reg))]
-
-
-def _extract_bits_by_index(bitstring_rev: str, bit_indices: List[int]) -> List[str]:
-    return [bitstring_rev[idx] for idx in bit_indices]
 
+def _tally(
+    addr_values: np.ndarray,
+    bus_values: np.ndarray,
+    weights: np.ndarray,
+    addr_width: int,
+    bus_width: int,
+) -> Dict[str, int]:
+    """Sum weights per (address, bus) value pair into "addr|bus" keyed counts."""
 
-def _logical_from_dual_rail(rail0: str, rail1: str) -> Tuple[str, bool]:
-    if rail0 == "0" and rail1 == "1":
-        return "0", True
-    if rail0 == "1" and rail1 == "0":
-        return "1", True
-    return "X", False
+    codes, inverse = np.unique((addr_values << bus_width) | bus_values, return_inverse=True)
+    totals = np.zeros(len(codes), dtype=weights.dtype)
+    np.add.at(totals, inverse.ravel(), weights)
+    bus_mask = (1 << bus_width) - 1
+    return {
+        f"{int(code) >> bus_width:0{addr_width}b}|{int(code) & bus_mask:0{bus_width}b}": total.item()
+        for code, total in zip(codes, totals)
+    }
 
 
 def _bucket_counts_to_logical(
@@ -104,21 +111,12 @@ def _bucket_counts_to_logical(
     addr_reg: ClassicalRegister,
     bus_reg: ClassicalRegister,
 ) -> Dict[str, int]:
-    addr_indices = _reg_bit_indices(circuit, addr_reg)
-    bus_indices = _reg_bit_indices(circuit, bus_reg)
-
-    logical_counts: Dict[str, int] = {}
-    for bitstring, count in counts.items():
-        rev = _bitstring_to_rev(bitstring)
-        addr_bits = _extract_bits_by_index(rev, addr_indices)
-        bus_bits = _extract_bits_by_index(rev, bus_indices)
-
-        addr_str = "".join(reversed(addr_bits))
-        bus_str = "".join(reversed(bus_bits))
-
-        key = f"{addr_str}|{bus_str}"
-        logical_counts[key] = logical_counts.get(key, 0) + count
-    return logical_counts
+    bits, weights = counts_to_bit_array(counts)
+    if not len(weights):
+        return {}
+    addr_bits = bits[:, register_bit_indices(circuit, addr_reg)]
+    bus_bits = bits[:, register_bit_indices(circuit, bus_reg)]
+    return _tally(_bits_to_int(addr_bits), _bits_to_int(bus_bits), weights, len(addr_reg), len(bus_reg))
 
 
 def _dualrail_counts_to_logical(
@@ -128,47 +126,26 @@ def _dualrail_counts_to_logical(
     bus_reg: ClassicalRegister,
     logical_bits: int,
 ) -> Tuple[Dict[str, int], float]:
-    addr_indices = _reg_bit_indices(circuit, addr_reg)
-    bus_indices = _reg_bit_indices(circuit, bus_reg)
-
-    logical_counts: Dict[str, int] = {}
-    invalid = 0
-    total = 0
-
-    for bitstring, count in counts.items():
-        rev = _bitstring_to_rev(bitstring)
-        addr_bits = _extract_bits_by_index(rev, addr_indices)
-        bus_bits = _extract_bits_by_index(rev, bus_indices)
-
-        addr_logical = []
-        valid = True
-        for i in range(logical_bits):
-            rail0 = addr_bits[2 * i]
-            rail1 = addr_bits[2 * i + 1]
-            bit, ok = _logical_from_dual_rail(rail0, rail1)
-            if not ok:
-                valid = False
-                break
-            addr_logical.append(bit)
-
-        bus_logical = "X"
-        if valid:
-            rail0 = bus_bits[0]
-            rail1 = bus_bits[1]
-            bus_logical, ok = _logical_from_dual_rail(rail0, rail1)
-            if not ok:
-                valid = False
-
-        total += count
-        if not valid:
-            invalid += count
-            continue
-
-        addr_str = "".join(reversed(addr_logical))
-        key = f"{addr_str}|{bus_logical}"
-        logical_counts[key] = logical_counts.get(key, 0) + count
-
-    invalid_rate = invalid / total if total else 0.0
+    bits, weights = counts_to_bit_array(counts)
+    total = weights.sum()
+    if not total:
+        return {}, 0.0
+    addr_bits = bits[:, register_bit_indices(circuit, addr_reg)[: 2 * logical_bits]]
+    bus_bits = bits[:, register_bit_indices(circuit, bus_reg)[:2]]
+
+    # A dual-rail pair is valid when exactly one rail is set; rail0 is the logical value.
+    valid = (addr_bits[:, 0::2] ^ addr_bits[:, 1::2]).all(axis=1) & (bus_bits[:, 0] ^ bus_bits[:, 1]).astype(bool)
+    invalid_rate = float(weights[~valid].sum() / total)
+    if not valid.any():
+        return {}, invalid_rate
+
+    logical_counts = _tally(
+        _bits_to_int(addr_bits[valid, 0::2]),
+        bus_bits[valid, 0].astype(np.int64),
+        weights[valid],
+        logical_bits,
+        1,
+    )
     return logical_counts, invalid_rate
 
 
@@ -192,11 +169,20 @@ def _compare_distributions(a: Dict[str, int], b: Dict[str, int]) -> Tuple[float,
     return l1, max_diff
 
 
-def run_bucktele(address_bits: int, data: List[int], shots: int, seed: int) -> Dict[str, int]:
+def _measure(circuits: List[QuantumCircuit], shots: int, seed: int) -> List[Dict[str, float]]:
+    """Sampled counts (one batched Aer job), or exact distributions when shots is 0."""
+
+    if shots:
+        return run_counts(circuits, shots, seed)
+    return [exact_distribution(circuit) for circuit in circuits]
+
+
+def build_bucktele(address_bits: int, data: List[int]) -> Tuple[QuantumCircuit, ClassicalRegister, ClassicalRegister]:
     address_list = [bin(i)[2:].zfill(address_bits) for i in range(2**address_bits)]
 
-    addr_q = QuantumRegister(address_bits, "addr")
-    bus_q = QuantumRegister(1, "bus")
+    # bucktele.py expects a legacy _size attribute on registers.
+    addr_q = LegacyQuantumRegister(address_bits, "addr")
+    bus_q = LegacyQuantumRegister(1, "bus")
     addr_c = ClassicalRegister(address_bits, "addr_c")
     bus_c = ClassicalRegister(1, "bus_c")
 
@@ -208,33 +194,20 @@ def run_bucktele(address_bits: int, data: List[int], shots: int, seed: int) -> D
     for i in range(address_bits):
         circuit.h(addr_q[i])
 
-    # bucktele.py expects a legacy _size attribute on registers.
-    addr_proxy = RegisterProxy(addr_q)
-    bus_proxy = RegisterProxy(bus_q)
-
-    qram(addr_proxy, bus_proxy)
+    qram(addr_q, bus_q)
     circuit.measure(bus_q, bus_c)
     circuit.measure(addr_q, addr_c)
-
-    backend = Aer.get_backend("qasm_simulator")
-    result = backend.run(circuit, shots=shots, seed_simulator=seed).result()
-    counts = result.get_counts(circuit)
-
-    return _bucket_counts_to_logical(counts, circuit, addr_c, bus_c)
+    return circuit, addr_c, bus_c
 
 
-def run_dualrail(address_bits: int, data: List[int], shots: int, seed: int) -> Tuple[Dict[str, int], float]:
-    address_list = [bin(i)[2:].zfill(address_bits) for i in range(2**address_bits)]
-
+def build_dualrail(address_bits: int, data: List[int]) -> Tuple[QuantumCircuit, ClassicalRegister, ClassicalRegister]:
     addr_q = QuantumRegister(2 * address_bits, "addr_dr")
     bus_q = QuantumRegister(2, "bus_dr")
     circuit = QuantumCircuit(addr_q, bus_q)
 
-    for pair in split_dual_rail_register(addr_q):
-        prepare_logical_zero(circuit, pair)
-        logical_h(circuit, pair)
+    initialize_dual_rail_superposition(circuit, split_dual_rail_register(addr_q))
 
-    qram = DualRailBucketQram(address_list, data, bandwidth=1)
+    qram = DualRailBucketQram(address_bits, data, bandwidth=1, use_barriers=False)
     qram(addr_q, bus_q)
 
     addr_c = ClassicalRegister(2 * address_bits, "addr_c")
@@ -243,11 +216,18 @@ def run_dualrail(address_bits: int, data: List[int], shots: int, seed: int) -> T
     circuit.add_register(bus_c)
     circuit.measure(addr_q, addr_c)
     circuit.measure(bus_q, bus_c)
+    return circuit, addr_c, bus_c
 
-    backend = Aer.get_backend("qasm_simulator")
-    result = backend.run(circuit, shots=shots, seed_simulator=seed).result()
-    counts = result.get_counts(circuit)
 
+def run_bucktele(address_bits: int, data: List[int], shots: int, seed: int) -> Dict[str, int]:
+    circuit, addr_c, bus_c = build_bucktele(address_bits, data)
+    (counts,) = _measure([circuit], shots, seed)
+    return _bucket_counts_to_logical(counts, circuit, addr_c, bus_c)
+
+
+def run_dualrail(address_bits: int, data: List[int], shots: int, seed: int) -> Tuple[Dict[str, int], float]:
+    circuit, addr_c, bus_c = build_dualrail(address_bits, data)
+    (counts,) = _measure([circuit], shots, seed)
     return _dualrail_counts_to_logical(counts, circuit, addr_c, bus_c, address_bits)
 
 
@@ -271,7 +251,92 @@ def build_cases(address_bits_list: List[int], random_cases: int) -> List[Tuple[s
     return cases
 
 
+def _run_case(
+    name: str,
+    address_bits: int,
+    data: List[int],
+    shots: int,
+    seed: int,
+    tolerance_l1: float,
+    tolerance_max: float,
+) -> CaseResult:
+    buck_circuit, buck_addr, buck_bus = build_bucktele(address_bits, data)
+    dual_circuit, dual_addr, dual_bus = build_dualrail(address_bits, data)
+    # Sampled runs send both circuits to Aer in one job; with SHOTS=0 each gets its own exact run.
+    buck_counts, dual_counts = _measure([buck_circuit, dual_circuit], shots, seed)
+    buck = _bucket_counts_to_logical(buck_counts, buck_circuit, buck_addr, buck_bus)
+    dual, invalid_rate = _dualrail_counts_to_logical(dual_counts, dual_circuit, dual_addr, dual_bus, address_bits)
+
+    l1, max_diff = _compare_distributions(buck, dual)
+    passed = l1 <= tolerance_l1 and max_diff <= tolerance_max and invalid_rate <= 0.01
+    return CaseResult(
+        name=name,
+        l1_distance=l1,
+        max_diff=max_diff,
+        invalid_rate=invalid_rate,
+        passed=passed,
+    )
+
+
+def _build_dualrail_qram(address_bits: int, data: List[int], **options) -> Tuple[DualRailQram, QuantumCircuit]:
+    qram = DualRailQram(address_bits, data, **options)
+    circuit = qram(QuantumRegister(2 * address_bits, "addr_dr"), QuantumRegister(2, "bus_dr"))
+    return qram, circuit
+
+
+def _operation_indices(circuit: QuantumCircuit, clbit_modulus: int = 0) -> List[Tuple[str, List[int], List[int]]]:
+    """(name, qubit indices, clbit indices) per instruction, clbits optionally taken mod clbit_modulus."""
+
+    operations = []
+    for inst in circuit.data:
+        qubits = [circuit.find_bit(qubit).index for qubit in inst.qubits]
+        clbits = [circuit.find_bit(clbit).index for clbit in inst.clbits]
+        if clbit_modulus:
+            clbits = [index % clbit_modulus for index in clbits]
+        operations.append((inst.operation.name, qubits, clbits))
+    return operations
+
+
+def check_builders(address_bits: int, data: List[int]) -> List[str]:
+    """Cross-check the cached and alternative DualRailQram builds; returns the failures."""
+
+    failures = []
+
+    # query_circuit binds data into a cached parametric build, so it must
+    # match a fresh build bound to the same table, before and after transpiling.
+    qram, circuit = _build_dualrail_qram(address_bits, data, parametric_data=True)
+    direct = qram.bind_data(circuit)
+    if query_circuit(address_bits, data) != direct:
+        failures.append("query_circuit differs from a direct build")
+    basis = ("rx", "rz", "cz")
+    if query_circuit(address_bits, data, basis_gates=basis) != transpile(
+        direct, basis_gates=list(basis), optimization_level=0
+    ):
+        failures.append("transpiled query_circuit differs from a transpiled direct build")
+
+    # Pool mode emits the full-mode operations, with syndrome bits cycling through the pool.
+    pool_size = 3
+    _, full = _build_dualrail_qram(address_bits, data, syndrome_mode="full")
+    _, pool = _build_dualrail_qram(address_bits, data, syndrome_mode="pool", syndrome_pool_size=pool_size)
+    if _operation_indices(full, clbit_modulus=pool_size) != _operation_indices(pool):
+        failures.append("pool syndrome mode does not follow the full-mode build")
+
+    # Each logical value lands on its one-hot rail: |1_L> sets rail0, |0_L> rail1.
+    values = [i % 2 for i in range(address_bits)]
+    qreg = QuantumRegister(2 * address_bits, "addr_dr")
+    creg = ClassicalRegister(2 * address_bits, "addr_c")
+    prepared = QuantumCircuit(qreg, creg)
+    initialize_dual_rail(prepared, split_dual_rail_register(qreg), values)
+    prepared.measure(qreg, creg)
+    expected = "".join("01" if value else "10" for value in reversed(values))
+    if exact_distribution(prepared) != {expected: 1.0}:
+        failures.append("initialize_dual_rail prepares the wrong rails")
+    return failures
+
+
 def main() -> int:
+    # SHOTS=0 compares exact distributions instead of samples; it needs a
+    # statevector of the whole light cone, so keep it to small ADDRESS_BITS.
     shots = int(os.environ.get("SHOTS", "32"))
     random_cases = int(os.environ.get("RANDOM_CASES", "0"))
     bits_env = os.environ.get("ADDRESS_BITS", "2")
@@ -280,37 +345,43 @@ def main() -> int:
     tolerance_l1 = float(os.environ.get("TOL_L1", "0.15"))
     tolerance_max = float(os.environ.get("TOL_MAX", "0.12"))
 
-    results: List[CaseResult] = []
+    cases = build_cases(address_bits_list, random_cases)
+    workers = int(os.environ.get("WORKERS", "0")) or os.cpu_count() or 1
+    workers = max(1, min(workers, len(cases)))
 
-    for idx, (name, address_bits, data) in enumerate(
-        build_cases(address_bits_list, random_cases)
-    ):
-        seed = 100 + idx
-        buck = run_bucktele(address_bits, data, shots, seed)
-        dual, invalid_rate = run_dualrail(address_bits, data, shots, seed)
-
-        l1, max_diff = _compare_distributions(buck, dual)
-        passed = l1 <= tolerance_l1 and max_diff <= tolerance_max and invalid_rate <= 0.01
-        results.append(
-            CaseResult(
-                name=name,
-                l1_distance=l1,
-                max_diff=max_diff,
-                invalid_rate=invalid_rate,
-                passed=passed,
+    # Cases are independent simulations, so run them in separate processes.
+    # Results are collected in submission order to keep the report stable.
+    # Each worker gets its share of the cores so Aer does not oversubscribe.
+    os.environ.setdefault("QRAM_AER_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+    results: List[CaseResult] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _run_case, name, address_bits, data, shots, 100 + idx, tolerance_l1, tolerance_max
+            )
+            for idx, (name, address_bits, data) in enumerate(cases)
+        ]
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            print(
+                f"{result.name}: L1={result.l1_distance:.4f} max={result.max_diff:.4f} "
+                f"invalid={result.invalid_rate:.4f} {'PASS' if result.passed else 'FAIL'}"
             )
-        )
 
-        print(
-            f"{name}: L1={l1:.4f} max={max_diff:.4f} invalid={invalid_rate:.4f} "
-            f"{'PASS' if passed else 'FAIL'}"
-        )
+    builder_failures = [
+        f"n={address_bits}: {failure}"
+        for address_bits in address_bits_list
+        for failure in check_builders(address_bits, [i % 2 for i in range(2**address_bits)])
+    ]
+    for failure in builder_failures:
+        print(f"builder check FAIL {failure}")
 
     total = len(results)
     passed = sum(1 for r in results if r.passed)
-    print(f"\nSummary: {passed}/{total} passed")
+    print(f"\nSummary: {passed}/{total} passed, builder checks {'FAIL' if builder_failures else 'PASS'}")
 
-    return 0 if passed == total else 1
+    return 0 if passed == total and not builder_failures else 1
 
 
 if __name__ == "__main__":